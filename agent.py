@@ -1,4 +1,4 @@
-import openai
+import asyncio
 import os
 import json
 import nbformat as nbf
@@ -14,6 +14,7 @@ from jupyter_client import KernelManager
 from nbformat.v4 import new_code_cell, new_output
 from deepresearch import DeepResearcher
 from utils import get_documentation
+from clients import get_client
 
 AVAILABLE_PACKAGES = "pandas, numpy, matplotlib, seaborn, statsmodels, linearmodels, scikit-learn, scipy"
 class AnalysisAgent:
@@ -46,7 +47,7 @@ class AnalysisAgent:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_dir = os.path.join(output_home, "outputs", f"{analysis_name}_{timestamp}")
         
-        self.client = openai.OpenAI(api_key=openai_api_key)
+        self.client = get_client(openai_api_key)
         
         # Initialize code memory to track the last few cells of code
         self.code_memory = []
@@ -1294,6 +1295,15 @@ print(f"Data loaded: {{adata.shape[0]}} cells and {{adata.shape[1]}} genes")
         except Exception as e:
             print(f"⚠️ Failed to improve notebook: {e}")
 
+    async def aimprove_notebook(self, notebook_path, feedback, output_path=None):
+        """Async variant of `improve_notebook`.
+
+        Runs the notebook read/write in a worker thread so callers can improve
+        several notebooks concurrently (e.g. with `asyncio.gather`).
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.improve_notebook, notebook_path, feedback, output_path)
+
 def strip_code_markers(text):
     # Remove ```python, ``` and ```
     return re.sub(r'```python|```', '', text)
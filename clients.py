@@ -0,0 +1,19 @@
+import functools
+import openai
+
+
+# Built from the SDK's own types: the SDK's HTTP stack is not necessarily the `httpx` package
+HTTP_LIMITS = type(openai.DEFAULT_CONNECTION_LIMITS)(max_connections=100, max_keepalive_connections=50)
+# Reasoning models can take minutes before the first byte, so keep the SDK's 600s read timeout
+HTTP_TIMEOUT = openai.Timeout(600.0, connect=10.0)
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(api_key):
+    """Return a shared OpenAI client for `api_key`, created on first use.
+
+    Uses HTTP/2 and one shared connection pool so concurrent requests
+    (summaries, agent calls) reuse connections instead of opening new ones.
+    """
+    http_client = openai.DefaultHttpxClient(http2=True, limits=HTTP_LIMITS)
+    return openai.OpenAI(api_key=api_key, http_client=http_client, timeout=HTTP_TIMEOUT)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import os
 from typing import Optional
-import openai
+from clients import get_client
 
 
 class DeepResearcher:
@@ -11,7 +11,7 @@ class DeepResearcher:
     """
 
     def __init__(self, openai_api_key: str):
-        self.client = openai.OpenAI(api_key=openai_api_key)
+        self.client = get_client(openai_api_key)
         # Allow overriding via env; default to lightweight for faster turnaround
         self.model = os.environ.get(
             "DEEP_RESEARCH_MODEL",
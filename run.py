@@ -1,14 +1,338 @@
 import os
 import json
 import argparse
-import glob
+import fnmatch
+import hashlib
+import heapq
+import io
+import random
+import re
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-import openai
 import pandas as pd
+import pyarrow.parquet as pq
 from dotenv import load_dotenv
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from pypdf import PdfReader
 from agent import AnalysisAgent
+from clients import get_client
+
+try:
+    import orjson  # optional: faster JSON encoding for large catalogs
+except ImportError:
+    orjson = None
+
+
+# Always use a fast model for summarization (not o3)
+SUMMARY_MODEL = "gpt-4o-mini"  # Fast and cheap for summarization
+SUMMARY_SYSTEM_PROMPT = "You write concise, structured empirical economics summaries."
+
+
+# Maximum characters of paper text sent to the summarization model
+PAPER_CHAR_BUDGET = 120000
+
+# Lowercased column names that hint at a panel / treatment design when cataloging
+TIME_KEYS = frozenset({"time", "year", "date", "t"})
+UNIT_KEYS = frozenset({"unit", "id", "panelid", "county", "state", "region", "firm"})
+TREAT_KEYS = frozenset({"treat", "treated", "policy", "post", "d"})
+OUTCOME_KEYS = frozenset({"y", "outcome", "dep", "dependent", "lhs"})
+
+# Bump whenever the shape or meaning of infer_file's output changes, to invalidate
+# entries in logs/catalog_cache.json
+CATALOG_CACHE_VERSION = 1
+
+# Below this many pages, spawning worker processes costs more than it saves
+PARALLEL_PDF_MIN_PAGES = 16
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# PdfReader opened once per worker process by `_init_pdf_worker`
+_worker_reader = None
+
+
+def _init_pdf_worker(path):
+    """Open the PDF once in each worker, so pages aren't re-parsed per task."""
+    global _worker_reader
+    _worker_reader = PdfReader(path)
+
+
+def _extract_page(i):
+    """Extract the text of a single PDF page (runs in a worker process)."""
+    try:
+        return i, _worker_reader.pages[i].extract_text() or ""
+    except Exception:
+        return i, ""
+
+
+def usable_cpus():
+    """Number of CPUs this process may run on (respects affinity / container limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def extract_pdf_text(pdf_path, max_chars=None):
+    """Extract text from a PDF's pages, in parallel for long documents.
+
+    Extraction stops at the first page that pushes the total past `max_chars`,
+    since text beyond that budget is never sent to the model. In the parallel
+    path, pages already queued past that point are cancelled or discarded.
+
+    Returns:
+        tuple: (text, pages_read, total_pages)
+    """
+    reader = PdfReader(pdf_path)
+    n = len(reader.pages)
+    buf = io.StringIO()
+    total, pages_read = 0, 0
+    workers = usable_cpus()
+    if n < PARALLEL_PDF_MIN_PAGES or workers < 2:
+        for page in reader.pages:
+            pages_read += 1
+            try:
+                txt = page.extract_text() or ""
+            except Exception:
+                continue
+            buf.write(txt)
+            buf.write("\n\n")
+            total += len(txt)
+            if max_chars is not None and total > max_chars:
+                break
+    else:
+        # Keep only a couple of pages per worker in flight and consume them in page order,
+        # so extraction stops within a few pages of the budget on any core count
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker,
+                                 initargs=(pdf_path,)) as ex:
+            pending = deque()
+            next_page = 0
+            while next_page < n or pending:
+                while next_page < n and len(pending) < workers * 2:
+                    pending.append(ex.submit(_extract_page, next_page))
+                    next_page += 1
+                _, txt = pending.popleft().result()
+                pages_read += 1
+                buf.write(txt)
+                buf.write("\n\n")
+                total += len(txt)
+                if max_chars is not None and total > max_chars:
+                    for fut in pending:
+                        fut.cancel()
+                    break
+    return buf.getvalue().strip(), pages_read, n
+
+
+def json_line(obj):
+    """Serialize `obj` as a newline-terminated JSON line (bytes), using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj) + "\n").encode()
+
+
+def discover_files(data_dir, patterns):
+    """Find files under `data_dir` matching any of `patterns` in a single directory walk.
+
+    Plain extension patterns ("*.csv") are matched by extension, case-insensitively
+    (unlike `glob`, "B.CSV" matches "*.csv"). Other patterns are matched with `fnmatch`
+    against the file name, or, if they contain a directory part ("raw/*.csv"), against
+    the path relative to `data_dir`, like `glob` with a leading "**/" ("**" components
+    match zero or more directories).
+    Hidden files and directories are skipped, as with `glob`.
+
+    Returns:
+        list: `os.DirEntry` objects, whose cached `stat()` saves re-statting each file.
+    """
+    exts, name_pats, path_pats = set(), [], []
+    for pat in patterns:
+        ext = pat[1:]
+        if pat.startswith("*.") and ext.count(".") == 1 and not any(ch in ext for ch in "*?[/" + os.sep):
+            exts.add(ext.lower())
+        elif "/" in pat or os.sep in pat:
+            path_pats.append([part for part in pat.replace(os.sep, "/").split("/") if part])
+        else:
+            name_pats.append(fnmatch.translate(pat))
+    name_re = re.compile("|".join(name_pats)) if name_pats else None
+
+    def match_parts(parts, comps):
+        # "*" never crosses a "/"; a "**" component matches zero or more directories
+        if not comps:
+            return not parts
+        if comps[0] == "**":
+            return any(match_parts(parts[i:], comps[1:]) for i in range(len(parts) + 1))
+        return bool(parts) and fnmatch.fnmatch(parts[0], comps[0]) and match_parts(parts[1:], comps[1:])
+
+    def match_path(path):
+        parts = os.path.relpath(path, data_dir).split(os.sep)
+        return any(match_parts(parts, ["**"] + comps) for comps in path_pats)
+
+    entries = []
+    stack = [data_dir]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                name = entry.name
+                if (os.path.splitext(name)[1].lower() in exts
+                        or (name_re and name_re.match(name))
+                        or (path_pats and match_path(entry.path))):
+                    entries.append(entry)
+    return entries
+
+
+def estimate_csv_rows(fp, size, sample_bytes=64 * 1024):
+    """Estimate the number of data rows in a CSV from its first `sample_bytes` bytes.
+
+    Exact when the whole file fits in the sample; otherwise extrapolates the average
+    line length of the sample to the full file size.
+    """
+    with open(fp, "rb") as f:
+        chunk = f.read(sample_bytes)
+    lines = chunk.count(b"\n")
+    if len(chunk) >= size:
+        if chunk and not chunk.endswith(b"\n"):
+            lines += 1
+        return max(lines - 1, 0)  # minus header
+    if lines == 0:
+        return None
+    return max(int(size / (len(chunk) / lines)) - 1, 0)
+
+
+def build_summary_request(paper_text, custom_id="paper"):
+    """Build a Batch API JSONL request line that summarizes a paper's text."""
+    summary_prompt = (
+        "You are an empirical economics assistant. Summarize the paper succinctly, focusing on: "
+        "research question, dataset(s), key variables (likely outcome, treatment, time, unit), "
+        "identification strategy (e.g., OLS/FE, DID/event-study, IV), and any notable caveats. "
+        "Return a clear 10-15 sentence summary that can guide downstream analysis.\n\n"
+        "Paper text begins:\n" + paper_text[:PAPER_CHAR_BUDGET]  # cap to avoid excessive tokens
+    )
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": SUMMARY_MODEL,
+            "messages": [
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": summary_prompt},
+            ],
+        },
+    }
+
+
+def create_completion_with_retry(client, body, attempts=3):
+    """Call the chat completions endpoint, retrying transient failures with exponential backoff."""
+    # This loop owns retries; leaving the SDK's own retries on would multiply the attempts
+    client = client.with_options(max_retries=0)
+    for attempt in range(attempts):
+        try:
+            return client.chat.completions.create(**body)
+        except (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError) as e:
+            if attempt == attempts - 1:
+                raise
+            delay = (2 ** attempt) + random.random()
+            print(f"⚠️ Summarization request failed ({e.__class__.__name__}); retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def run_summary_batch(client, requests, max_wait=24 * 3600):
+    """Submit summary requests through the Batch API and wait for the results.
+
+    The input is uploaded from memory, and the uploaded input, output and error
+    files are deleted afterwards so no copy of the paper text is left behind.
+
+    Args:
+        client: OpenAI client.
+        requests (list): Request lines produced by `build_summary_request`.
+        max_wait (int): Give up polling after this many seconds.
+
+    Returns:
+        dict: Mapping of custom_id -> summary text ("" if that request failed).
+    """
+    payload = "".join(json.dumps(req) + "\n" for req in requests).encode("utf-8")
+    batch_file = client.files.create(file=("summary_batch_input.jsonl", payload), purpose="batch")
+    batch = None
+    try:
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        print(f"📨 Submitted summary batch {batch.id} ({len(requests)} request(s))")
+
+        # Poll with exponential backoff, capped at 5 minutes between checks
+        delay, waited = 5, 0
+        try:
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                if waited >= max_wait:
+                    raise TimeoutError(f"Summary batch {batch.id} not finished after {waited}s")
+                time.sleep(delay)
+                waited += delay
+                delay = min(delay * 2, 300)
+                batch = client.batches.retrieve(batch.id)
+        except KeyboardInterrupt:
+            # Don't leave the batch running (and billing) server-side
+            print(f"\n⚠️ Cancelling summary batch {batch.id}...")
+            client.batches.cancel(batch.id)
+            raise
+        if batch.status != "completed" or not batch.output_file_id:
+            details = []
+            errors = getattr(batch, "errors", None)
+            for err in (getattr(errors, "data", None) or []):
+                details.append(f"{getattr(err, 'code', '')}: {getattr(err, 'message', '')}")
+            if batch.error_file_id:
+                error_text = client.files.content(batch.error_file_id).text
+                details.extend(line for line in error_text.splitlines() if line.strip())
+            detail = ("; " + " | ".join(details[:5])) if details else ""
+            raise RuntimeError(f"Summary batch {batch.id} ended with status: {batch.status}{detail}")
+
+        summaries = {}
+        content = client.files.content(batch.output_file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            try:
+                text = rec["response"]["body"]["choices"][0]["message"]["content"] or ""
+            except (KeyError, IndexError, TypeError):
+                text = ""
+            summaries[rec.get("custom_id")] = text
+        return summaries
+    finally:
+        # Best-effort cleanup; a failed delete shouldn't mask the real result or error
+        file_ids = [batch_file.id]
+        if batch is not None:
+            file_ids += [batch.output_file_id, batch.error_file_id]
+        for file_id in file_ids:
+            if not file_id:
+                continue
+            try:
+                client.files.delete(file_id)
+            except Exception as e:
+                print(f"⚠️ Could not delete batch file {file_id}: {e}")
 
 
 def main():
@@ -36,6 +360,9 @@ def main():
     parser.add_argument("--paper-pdf",
                        required=True,
                        help="Path to research paper PDF (required); text is extracted and summarized automatically")
+    parser.add_argument("--batch-summaries",
+                       action="store_true",
+                       help="Summarize the paper through the OpenAI Batch API (cheaper, but may take up to 24h)")
     
     parser.add_argument("--analysis-name", 
                        default="covid19",
@@ -100,6 +427,10 @@ def main():
     args = parser.parse_args()
     # Load environment variables from .env if present
     load_dotenv()
+
+    # Summaries, caches and catalogs all live under <log-home>/logs
+    logs_dir = os.path.join(args.log_home, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
     
     # Check if OpenAI API key is available
     openai_api_key = os.getenv('OPENAI_API_KEY')
@@ -114,49 +445,63 @@ def main():
         return 1
     
     try:
-            print("📄 Extracting text from paper PDF...")
-            reader = PdfReader(args.paper_pdf)
-            raw_text = []
-            for page in reader.pages:
-                try:
-                    raw_text.append(page.extract_text() or "")
-                except Exception:
-                    continue
-            paper_text = "\n\n".join(raw_text).strip()
-            if not paper_text:
-                print("❌ Failed to extract any text from PDF")
-                return 1
+            # Reuse a previous summary of the exact same PDF (and summary model) if we have one
+            cache_dir = os.path.join(logs_dir, "summary_cache")
+            cache_key = f"{file_sha256(args.paper_pdf)}_{SUMMARY_MODEL}"
+            cached_summary_path = os.path.join(cache_dir, f"{cache_key}.txt")
+            if os.path.exists(cached_summary_path):
+                print(f"♻️  Reusing cached paper summary → {cached_summary_path}")
+                paper_summary_path = cached_summary_path
+            else:
+                print("📄 Extracting text from paper PDF...")
+                paper_text, pages_read, total_pages = extract_pdf_text(args.paper_pdf, max_chars=PAPER_CHAR_BUDGET)
+                if pages_read < total_pages:
+                    print(f"✂️  Text budget of {PAPER_CHAR_BUDGET} chars reached; skipped last "
+                          f"{total_pages - pages_read} of {total_pages} pages")
+                if not paper_text:
+                    print("❌ Failed to extract any text from PDF")
+                    return 1
+
+                # Summarize with OpenAI into a concise empirical-econ summary
+                print("🧾 Summarizing paper content with LLM...")
+                client = get_client(openai_api_key)
+                paper_id = os.path.splitext(os.path.basename(args.paper_pdf))[0]
+                summary_request = build_summary_request(paper_text, custom_id=paper_id)
+                if args.batch_summaries:
+                    summaries = run_summary_batch(client, [summary_request])
+                    paper_summary_txt = summaries.get(paper_id, "")
+                else:
+                    resp = create_completion_with_retry(client, summary_request["body"])
+                    paper_summary_txt = resp.choices[0].message.content or ""
+                # Only cache real summaries, so a failed run is retried next time
+                summarized = bool(paper_summary_txt.strip())
+                if not summarized:
+                    paper_summary_txt = paper_text[:5000]
+                # Release the full PDF text before the agent starts loading data
+                del paper_text, summary_request
+
+                ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+                extracted_summary_path = os.path.join(logs_dir, f"paper_summary_extracted_{ts}.txt")
+                linked = False
+                if summarized:
+                    # Write via a temp file so an interrupted run can't leave a truncated cache entry
+                    os.makedirs(cache_dir, exist_ok=True)
+                    tmp_path = f"{cached_summary_path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w") as f:
+                        f.write(paper_summary_txt)
+                    os.replace(tmp_path, cached_summary_path)
 
-            # Summarize with OpenAI into a concise empirical-econ summary
-            # Always use a fast model for summarization (not o3)
-            print("🧾 Summarizing paper content with LLM...")
-            client = openai.OpenAI(api_key=openai_api_key)
-            summary_model = "gpt-4o-mini"  # Fast and cheap for summarization
-            summary_prompt = (
-                "You are an empirical economics assistant. Summarize the paper succinctly, focusing on: "
-                "research question, dataset(s), key variables (likely outcome, treatment, time, unit), "
-                "identification strategy (e.g., OLS/FE, DID/event-study, IV), and any notable caveats. "
-                "Return a clear 10-15 sentence summary that can guide downstream analysis.\n\n"
-                "Paper text begins:\n" + paper_text[:120000]  # cap to avoid excessive tokens
-            )
-            resp = client.chat.completions.create(
-                model=summary_model,
-                messages=[
-                    {"role": "system", "content": "You write concise, structured empirical economics summaries."},
-                    {"role": "user", "content": summary_prompt},
-                ],
-            )
-            paper_summary_txt = resp.choices[0].message.content or ""
-            if not paper_summary_txt.strip():
-                paper_summary_txt = paper_text[:5000]
-
-            os.makedirs("logs", exist_ok=True)
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            extracted_summary_path = os.path.join("logs", f"paper_summary_extracted_{ts}.txt")
-            with open(extracted_summary_path, "w") as f:
-                f.write(paper_summary_txt)
-            print(f"📝 Saved extracted paper summary → {extracted_summary_path}")
-            paper_summary_path = extracted_summary_path
+                    # Keep the timestamped name for this run, pointing at the cached copy
+                    try:
+                        os.symlink(os.path.relpath(cached_summary_path, logs_dir), extracted_summary_path)
+                        linked = True
+                    except OSError:
+                        pass
+                if not linked:
+                    with open(extracted_summary_path, "w") as f:
+                        f.write(paper_summary_txt)
+                print(f"📝 Saved extracted paper summary → {extracted_summary_path}")
+                paper_summary_path = extracted_summary_path
     except Exception as e:
         print(f"❌ Error extracting/summarizing PDF: {e}")
         return 1
@@ -172,45 +517,53 @@ def main():
 
         # Discover files by patterns
         patterns = [p.strip() for p in (args.data_glob or "").split(",") if p.strip()]
-        files = []
-        for pat in patterns:
-            files.extend(glob.glob(os.path.join(args.data_dir, "**", pat), recursive=True))
-        files = sorted(set(files))
+        # A single walk visits each file once, so no dedupe is needed
+        entries = sorted(discover_files(args.data_dir, patterns), key=lambda e: e.path)
+        files = [e.path for e in entries]
+        stats = {e.path: e.stat() for e in entries}
         if not files:
             print(f"❌ No tabular files found in {args.data_dir} with patterns {patterns}")
             return 1
 
         # Build lightweight catalog
-        def infer_file(fp):
+        def infer_file(fp, size=None):
             ext = os.path.splitext(fp)[1].lower()
-            size = os.path.getsize(fp)
+            if size is None:
+                size = os.path.getsize(fp)
             cols, nrows, ncols = [], None, None
-            sample_cols = []
             try:
                 if ext == ".csv":
-                    df = pd.read_csv(fp, nrows=200)
+                    # Only the header is needed; estimate the row count from file size
+                    cols = pd.read_csv(fp, nrows=0).columns
+                    nrows, ncols = estimate_csv_rows(fp, size), len(cols)
                 elif ext == ".parquet":
-                    df = pd.read_parquet(fp)
+                    # Schema and row count live in the footer; don't load the data itself
+                    with pq.ParquetFile(fp) as pf:
+                        cols = pf.schema_arrow.names
+                        nrows, ncols = pf.metadata.num_rows, len(cols)
                 elif ext == ".feather":
                     df = pd.read_feather(fp)
+                    cols = df.columns
+                    nrows, ncols = df.shape
                 elif ext == ".dta":
                     # Stata files can be slow; only read first 200 rows for cataloging
                     iter_dta = pd.read_stata(fp, chunksize=200, convert_categoricals=False)
                     df = next(iter_dta)
+                    cols = df.columns
+                    nrows, ncols = df.shape
                 else:
                     return {"path": fp, "ext": ext, "size": size, "error": "unsupported_ext"}
-                nrows, ncols = df.shape
-                cols = list(df.columns)
-                sample_cols = cols[:20]
+                # Slice before listing so wide files don't materialize every column name
+                sample_cols = list(cols[:20])
             except Exception as e:
                 return {"path": fp, "ext": ext, "size": size, "error": str(e)}
 
             # Heuristic signals
-            colset = {c.lower(): c for c in cols}
-            has_time = any(k in colset for k in ["time", "year", "date", "t"])
-            has_unit = any(k in colset for k in ["unit", "id", "panelid", "county", "state", "region", "firm"])
-            has_treat = any(k in colset for k in ["treat", "treated", "policy", "post", "d"])
-            has_outcome = any(k in colset for k in ["y", "outcome", "dep", "dependent", "lhs"])
+            colset = {str(c).lower() for c in cols}
+            has_time = not TIME_KEYS.isdisjoint(colset)
+            has_unit = not UNIT_KEYS.isdisjoint(colset)
+            has_treat = not TREAT_KEYS.isdisjoint(colset)
+            has_outcome = not OUTCOME_KEYS.isdisjoint(colset)
 
             score = 0
             score += 3 if has_unit and has_time else 0
@@ -224,7 +577,57 @@ def main():
                 "signals": {"has_unit": has_unit, "has_time": has_time, "has_treat": has_treat, "has_outcome": has_outcome}
             }
 
-        catalog = [infer_file(fp) for fp in files]
+        # Reuse catalog entries for files unchanged since a previous run (same path, mtime, size)
+        catalog_cache_path = os.path.join(logs_dir, "catalog_cache.json")
+        try:
+            with open(catalog_cache_path, encoding="utf-8") as f:
+                cache_doc = json.load(f)
+        except (OSError, ValueError):
+            cache_doc = {}
+        # Entries written by a different infer_file format are discarded wholesale
+        if isinstance(cache_doc, dict) and cache_doc.get("version") == CATALOG_CACHE_VERSION:
+            catalog_cache = cache_doc.get("entries") or {}
+        else:
+            catalog_cache = {}
+
+        def cache_key(fp):
+            st = stats[fp]
+            return f"{os.path.abspath(fp)}:{st.st_mtime_ns}:{st.st_size}"
+
+        keys = [cache_key(fp) for fp in files]
+        misses = [fp for fp, key in zip(files, keys) if key not in catalog_cache]
+        if misses:
+            # Reads are I/O-bound (pandas parsers release the GIL), so overlap them across threads
+            with ThreadPoolExecutor(max_workers=min(16, len(misses))) as ex:
+                inferred = dict(zip(misses, ex.map(infer_file, misses, [stats[fp].st_size for fp in misses])))
+        else:
+            inferred = {}
+        catalog = [inferred.get(fp) or {**catalog_cache[key], "path": fp} for fp, key in zip(files, keys)]
+
+        # Drop stale entries for this data_dir (older mtimes/sizes, deleted or unmatched files)
+        data_root = os.path.join(os.path.abspath(args.data_dir), "")
+        live_keys = set(keys)
+        stale = [key for key in catalog_cache
+                 if key.rsplit(":", 2)[0].startswith(data_root) and key not in live_keys]
+        for key in stale:
+            del catalog_cache[key]
+
+        if misses or stale:
+            for fp, key in zip(files, keys):
+                entry = inferred.get(fp)
+                if entry and not entry.get("error"):
+                    catalog_cache[key] = entry
+            # Write via a temp file so an interrupted or concurrent run can't wipe the cache
+            tmp_path = f"{catalog_cache_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(json_line({"version": CATALOG_CACHE_VERSION, "entries": catalog_cache}))
+                os.replace(tmp_path, catalog_cache_path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
 
         # Choose primary file
         if args.primary_file:
@@ -241,21 +644,23 @@ def main():
             if not valid:
                 print("❌ No readable tabular files found in directory")
                 return 1
-            valid.sort(key=lambda c: (c.get("score", 0), c.get("nrows") or 0, c.get("size") or 0), reverse=True)
-            selected_data_path = valid[0]["path"]
+            best = heapq.nlargest(1, valid, key=lambda c: (c.get("score", 0), c.get("nrows") or 0, c.get("size") or 0))[0]
+            selected_data_path = best["path"]
 
         # Save catalog
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        os.makedirs("logs", exist_ok=True)
-        cat_path = os.path.join("logs", f"dataset_catalog_{ts}.json")
+        cat_path = os.path.join(logs_dir, f"dataset_catalog_{ts}.jsonl")
         try:
-            with open(cat_path, 'w') as f:
-                json.dump({
+            # JSONL: a metadata header line, then one line per cataloged file
+            with open(cat_path, 'wb') as f:
+                f.write(json_line({
+                    "_meta": True,
                     "data_dir": os.path.abspath(args.data_dir),
                     "patterns": patterns,
                     "selected": selected_data_path,
-                    "files": catalog
-                }, f, indent=2)
+                }))
+                for rec in catalog:
+                    f.write(json_line(rec))
             print(f"🗂  Saved dataset catalog → {cat_path}")
         except Exception:
             pass